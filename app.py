@@ -1,33 +1,151 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+import hashlib
 import json
+import mimetypes
 import os
-import smtplib
+import queue
+import re
+import secrets
 import sqlite3
-from contextlib import closing
-from email.message import EmailMessage
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
-
-import requests
-from flask import Flask, jsonify, request, session, send_from_directory
-from requests import RequestException
-from werkzeug.security import check_password_hash, generate_password_hash
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Tuple
+
+import bcrypt
+import ijson
+import orjson
+from cachetools import TTLCache
+from flask import (
+    Flask,
+    Response,
+    jsonify,
+    request,
+    session,
+    send_from_directory,
+    stream_with_context,
+)
+from flask.json.provider import JSONProvider
+from werkzeug.security import check_password_hash
+
+if TYPE_CHECKING:
+    import requests
+    from email.message import EmailMessage
+
+try:  # Prefer BLAKE3 when installed; stdlib BLAKE2b is the fallback.
+    from blake3 import blake3 as _blake3
+except ImportError:
+    _blake3 = None
 
 BASE_DIR = Path(__file__).resolve().parent
 USERS_FILE = BASE_DIR / "users.json"
 DB_FILE = BASE_DIR / "users.db"
 DEFAULT_FROM_EMAIL = os.getenv("MAIL_FROM_ADDRESS")
+BCRYPT_COST = int(os.getenv("BCRYPT_COST", "12"))
+
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+# Outbound OpenAI/SMTP calls run here so request handlers are not pinned
+# for the full upstream timeout window.
+_EXEC = ThreadPoolExecutor(max_workers=32)
+
+
+def fast_digest(data: bytes, digest_size: int = 16) -> bytes:
+    """Fast digest for cache keys and ETags; never used for passwords."""
+    if _blake3 is not None:
+        return _blake3(data).digest()[:digest_size]
+    return hashlib.blake2b(data, digest_size=digest_size).digest()
+
+
+_POOL_SIZE = 8
+_POOL: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=_POOL_SIZE)
+
+
+# Applied once per pooled connection; WAL allows readers during a writer
+# and synchronous=NORMAL drops the per-transaction fsync count.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+# Executed once per new connection so SQLite parses and caches the prepared
+# bytecode for the hot queries before the first real request needs them.
+_PREWARM_STATEMENTS = (
+    ("SELECT username, password, full_name, email, role FROM users WHERE username = ?", ("",)),
+    ("SELECT username, password, full_name, email, role FROM users WHERE lower(email) = ?", ("",)),
+    (
+        "SELECT username, password, full_name, email, role FROM users "
+        "WHERE username = ?1 OR lower(email) = ?2 LIMIT 1",
+        ("", ""),
+    ),
+    ("SELECT 1 FROM users LIMIT 1", ()),
+)
+
+
+def _prewarm_statements(conn: sqlite3.Connection) -> None:
+    """Prime the connection's statement cache with the hot queries."""
+    try:
+        for sql, params in _PREWARM_STATEMENTS:
+            conn.execute(sql, params).fetchone()
+    except sqlite3.OperationalError:
+        # First boot: the users table does not exist yet, so the cache
+        # simply warms on first real use instead.
+        pass
 
 
 def get_db_connection():
-    conn = sqlite3.connect(DB_FILE)
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    _prewarm_statements(conn)
     return conn
 
 
+def _init_pool() -> None:
+    """Pre-open a fixed set of connections shared by all request threads."""
+    while not _POOL.full():
+        _POOL.put(get_db_connection())
+
+
+@contextmanager
+def get_db():
+    """Borrow a pooled connection and return it once the caller is done."""
+    conn = _POOL.get()
+    try:
+        yield conn
+    finally:
+        # Never return a connection mid-transaction: a failed INSERT would
+        # otherwise keep SQLite's write lock and stall every other borrower.
+        if conn.in_transaction:
+            conn.rollback()
+        _POOL.put(conn)
+
+
+def _close_pool() -> None:
+    while True:
+        try:
+            _POOL.get_nowait().close()
+        except queue.Empty:
+            break
+
+
+atexit.register(_close_pool)
+
+
 def init_db() -> None:
-    with closing(get_db_connection()) as conn:
+    with get_db() as conn:
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS users (
@@ -41,60 +159,61 @@ def init_db() -> None:
             )
             """
         )
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON users(username)"
+        )
+        # The old non-unique index predates the uniqueness guarantee; the
+        # unique one makes case-variant duplicate emails an IntegrityError.
+        conn.execute("DROP INDEX IF EXISTS idx_users_email_lower")
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uidx_users_email_lower ON users(lower(email))"
+        )
         conn.commit()
 
 
-def load_users_from_json() -> Dict[str, Dict[str, Any]]:
+def iter_users_from_json() -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream (username, details) pairs from users.json without loading it whole."""
     if not USERS_FILE.exists():
-        return {}
-    try:
-        with USERS_FILE.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
-            if isinstance(data, dict):
-                return {
-                    username: {
+        return
+    with USERS_FILE.open("rb") as fh:
+        try:
+            for username, details in ijson.kvitems(fh, ""):
+                if isinstance(details, dict):
+                    yield username, {
                         "password": details.get("password", ""),
                         "full_name": details.get("full_name", username),
                         "email": details.get("email"),
                         "role": details.get("role", "Viewer"),
                     }
-                    for username, details in data.items()
-                    if isinstance(details, dict)
-                }
-    except json.JSONDecodeError:
-        pass
-    return {}
+        except ijson.JSONError:
+            return
 
 
 def migrate_users_from_json() -> None:
     """Load existing JSON users into SQLite if the table is empty."""
-    json_users = load_users_from_json()
-    if not json_users:
-        return
-
-    with closing(get_db_connection()) as conn:
-        existing_count = conn.execute("SELECT COUNT(1) FROM users").fetchone()[0]
-        if existing_count:
+    with get_db() as conn:
+        existing = conn.execute("SELECT 1 FROM users LIMIT 1").fetchone()
+        if existing:
             return
 
-        for username, details in json_users.items():
-            try:
-                conn.execute(
-                    """
-                    INSERT INTO users (username, password, full_name, email, role)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (
-                        username,
-                        details.get("password", ""),
-                        details.get("full_name") or username,
-                        details.get("email"),
-                        details.get("role") or "Viewer",
-                    ),
-                )
-            except sqlite3.IntegrityError:
-                continue
-        conn.commit()
+        rows = (
+            (
+                username,
+                details["password"],
+                details["full_name"] or username,
+                details["email"],
+                details["role"] or "Viewer",
+            )
+            for username, details in iter_users_from_json()
+        )
+        with conn:
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO users (username, password, full_name, email, role)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
 
 
 def lookup_user(login_identifier: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
@@ -102,43 +221,75 @@ def lookup_user(login_identifier: str) -> Tuple[Optional[str], Optional[Dict[str
     if not login_identifier:
         return None, None
 
-    with closing(get_db_connection()) as conn:
-        row = conn.execute(
-            "SELECT username, password, full_name, email, role FROM users WHERE username = ?",
-            (login_identifier,),
-        ).fetchone()
-        if row:
-            return row["username"], dict(row)
-
+    with get_db() as conn:
         row = conn.execute(
-            "SELECT username, password, full_name, email, role FROM users WHERE lower(email) = ?",
-            (login_identifier.lower(),),
+            "SELECT username, password, full_name, email, role FROM users "
+            "WHERE username = ?1 OR lower(email) = ?2 LIMIT 1",
+            (login_identifier, login_identifier.lower()),
         ).fetchone()
         if row:
             return row["username"], dict(row)
     return None, None
 
 
+_USER_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=30)
+_EMAIL_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=30)
+_CACHE_LOCK = threading.Lock()
+
+
+def invalidate_user(username: str, email: Optional[str] = None) -> None:
+    """Drop cached rows for a user after any mutation."""
+    with _CACHE_LOCK:
+        cached = _USER_CACHE.pop(username, None)
+        if email is None and cached:
+            email = cached.get("email")
+        if email:
+            _EMAIL_CACHE.pop(email.lower(), None)
+
+
 def get_user_by_username(username: str) -> Optional[Dict[str, Any]]:
-    with closing(get_db_connection()) as conn:
+    with _CACHE_LOCK:
+        cached = _USER_CACHE.get(username)
+    if cached is not None:
+        return cached
+
+    with get_db() as conn:
         row = conn.execute(
             "SELECT username, password, full_name, email, role FROM users WHERE username = ?",
             (username,),
         ).fetchone()
-        return dict(row) if row else None
+    if not row:
+        return None
+
+    user = dict(row)
+    with _CACHE_LOCK:
+        _USER_CACHE[username] = user
+    return user
 
 
 def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
-    with closing(get_db_connection()) as conn:
+    email_key = email.lower()
+    with _CACHE_LOCK:
+        cached = _EMAIL_CACHE.get(email_key)
+    if cached is not None:
+        return cached
+
+    with get_db() as conn:
         row = conn.execute(
             "SELECT username, password, full_name, email, role FROM users WHERE lower(email) = ?",
-            (email.lower(),),
+            (email_key,),
         ).fetchone()
-        return dict(row) if row else None
+    if not row:
+        return None
+
+    user = dict(row)
+    with _CACHE_LOCK:
+        _EMAIL_CACHE[email_key] = user
+    return user
 
 
 def create_user(username: str, password_hash: str, full_name: str, email: Optional[str], role: str) -> None:
-    with closing(get_db_connection()) as conn:
+    with get_db() as conn:
         conn.execute(
             """
             INSERT INTO users (username, password, full_name, email, role)
@@ -147,6 +298,52 @@ def create_user(username: str, password_hash: str, full_name: str, email: Option
             (username, password_hash, full_name, email, role),
         )
         conn.commit()
+    invalidate_user(username, email)
+    invalidate_session_payload(username)
+
+
+_SESSION_TTL = 60.0
+_SESSION_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_SESSION_LOCK = threading.Lock()
+
+
+def invalidate_session_payload(username: str) -> None:
+    """Drop the cached payload so the next poll rebuilds it."""
+    with _SESSION_LOCK:
+        _SESSION_CACHE.pop(username, None)
+
+
+def hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_COST)).decode()
+
+
+def _is_bcrypt_hash(stored_hash: str) -> bool:
+    return stored_hash.startswith("$2")
+
+
+def verify_password(stored_hash: str, password: str) -> bool:
+    """Check a password against bcrypt or a legacy Werkzeug hash.
+
+    Anything that is not a bcrypt hash (pbkdf2:, scrypt:, ...) is routed
+    through Werkzeug, which understands all of its own formats.
+    """
+    if not _is_bcrypt_hash(stored_hash):
+        return check_password_hash(stored_hash, password)
+    try:
+        return bcrypt.checkpw(password.encode(), stored_hash.encode())
+    except ValueError:
+        return False
+
+
+def update_password_hash(username: str, password_hash: str) -> None:
+    with get_db() as conn:
+        conn.execute(
+            "UPDATE users SET password = ? WHERE username = ?",
+            (password_hash, username),
+        )
+        conn.commit()
+    invalidate_user(username)
+    invalidate_session_payload(username)
 
 
 def get_session_payload() -> Dict[str, Any]:
@@ -155,46 +352,122 @@ def get_session_payload() -> Dict[str, Any]:
     if not username:
         return {"authenticated": False}
 
+    now = time.monotonic()
+    with _SESSION_LOCK:
+        entry = _SESSION_CACHE.get(username)
+    if entry and now - entry[0] < _SESSION_TTL:
+        return entry[1]
+
     user = get_user_by_username(username)
     if not user:
         session.pop("user", None)
+        invalidate_session_payload(username)
         return {"authenticated": False}
 
-    return {
+    payload = {
         "authenticated": True,
         "username": username,
         "display_name": user.get("full_name") or username,
         "role": user.get("role", "Viewer"),
         "email": user.get("email"),
     }
+    with _SESSION_LOCK:
+        _SESSION_CACHE[username] = (now, payload)
+    return payload
 
 
-app = Flask(__name__, static_folder="static")
-app.secret_key = "secret123"  # Demo secret; replace for production
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson's C serializer."""
 
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
+def read_json_body() -> Dict[str, Any]:
+    """Parse the request body with orjson, tolerating bad or missing JSON."""
+    try:
+        data = orjson.loads(request.get_data() or b"{}")
+    except orjson.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+app = Flask(__name__, static_folder="static")
+app.json = ORJSONProvider(app)
+app.config.update(
+    # Falling back to a random key keeps dev working but drops sessions
+    # across restarts; set SECRET_KEY in production.
+    SECRET_KEY=os.getenv("SECRET_KEY") or secrets.token_hex(32),
+    SESSION_REFRESH_EACH_REQUEST=False,
+    SESSION_COOKIE_HTTPONLY=True,
+    SESSION_COOKIE_SAMESITE="Lax",
+)
+
+_init_pool()
 init_db()
 migrate_users_from_json()
 
 
+_STATIC_CACHE_MAX_BYTES = 1024 * 1024
+_STATIC_CACHE: Dict[str, Tuple[bytes, str]] = {}
+_STATIC_CACHE_LOCK = threading.Lock()
+
+
+def serve_cached_file(path: Path, mimetype: Optional[str] = None, max_age: int = 300) -> Any:
+    """Serve a small file from an in-process cache with ETag revalidation."""
+    key = str(path)
+    with _STATIC_CACHE_LOCK:
+        entry = _STATIC_CACHE.get(key)
+    if entry is None:
+        if not path.is_file():
+            return jsonify({"error": "Not found."}), 404
+        body = path.read_bytes()
+        if len(body) > _STATIC_CACHE_MAX_BYTES:
+            return send_from_directory(path.parent, path.name)
+        etag = fast_digest(body, digest_size=8).hex()
+        entry = (body, etag)
+        with _STATIC_CACHE_LOCK:
+            _STATIC_CACHE[key] = entry
+
+    body, etag = entry
+    cache_control = f"public, max-age={max_age}"
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+    response = Response(
+        body,
+        mimetype=mimetype or mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+    )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
 @app.route("/")
 def root() -> Any:
-    return send_from_directory(BASE_DIR, "experiment4.html")
+    return serve_cached_file(BASE_DIR / "experiment4.html", mimetype="text/html")
 
 
 @app.route("/experiment4.html")
 def serve_experiment4() -> Any:
-    return send_from_directory(BASE_DIR, "experiment4.html")
+    return serve_cached_file(BASE_DIR / "experiment4.html", mimetype="text/html")
 
 
 @app.route("/assets/<path:filename>")
 def serve_assets(filename: str) -> Any:
-    assets_dir = BASE_DIR / "assets"
-    return send_from_directory(assets_dir, filename)
+    assets_dir = (BASE_DIR / "assets").resolve()
+    full_path = (assets_dir / filename).resolve()
+    if assets_dir != full_path and assets_dir not in full_path.parents:
+        return jsonify({"error": "Not found."}), 404
+    return serve_cached_file(full_path)
 
 
 @app.post("/api/signup")
 def signup() -> Any:
-    payload = request.get_json(force=True, silent=True) or {}
+    payload = read_json_body()
     username = (payload.get("username") or "").strip()
     password = payload.get("password") or ""
     full_name = (payload.get("full_name") or "").strip()
@@ -207,21 +480,24 @@ def signup() -> Any:
             400,
         )
 
-    if get_user_by_username(username):
-        return jsonify({"error": "Username already exists."}), 409
-
-    if email and get_user_by_email(email):
-        return jsonify({"error": "Email already in use."}), 409
+    if email and not _EMAIL_RE.match(email):
+        return jsonify({"error": "Invalid email address."}), 400
 
     try:
         create_user(
             username=username,
-            password_hash=generate_password_hash(password),
+            password_hash=hash_password(password),
             full_name=full_name,
             email=email,
             role=role,
         )
     except sqlite3.IntegrityError:
+        # Rare collision path: the UNIQUE constraints caught the duplicate,
+        # so query only now to decide which message to return.
+        if get_user_by_username(username):
+            return jsonify({"error": "Username already exists."}), 409
+        if email and get_user_by_email(email):
+            return jsonify({"error": "Email already in use."}), 409
         return jsonify({"error": "Unable to create account. Please try again."}), 500
 
     return (
@@ -239,7 +515,7 @@ def signup() -> Any:
 
 @app.post("/api/login")
 def login() -> Any:
-    payload = request.get_json(force=True, silent=True) or {}
+    payload = read_json_body()
     login_identifier = (payload.get("username") or "").strip()
     password = payload.get("password") or ""
 
@@ -247,39 +523,69 @@ def login() -> Any:
         return jsonify({"error": "Both username and password are required."}), 400
 
     username, user = lookup_user(login_identifier)
-    if not user or not check_password_hash(user["password"], password):
+    if not user or not verify_password(user["password"], password):
         return jsonify({"error": "Invalid username or password."}), 401
 
+    if not _is_bcrypt_hash(user["password"]):
+        # Transparently upgrade legacy Werkzeug hashes on successful login.
+        update_password_hash(username, hash_password(password))
+
+    invalidate_session_payload(username)
     session["user"] = username
     return jsonify(get_session_payload())
 
 
 @app.post("/api/logout")
 def logout() -> Any:
-    session.pop("user", None)
+    username = session.pop("user", None)
+    if username:
+        invalidate_session_payload(username)
     return jsonify({"success": True})
 
 
 @app.get("/api/session")
 def session_info() -> Any:
-    return jsonify(get_session_payload())
+    payload = get_session_payload()
+    etag = fast_digest(json.dumps(payload, sort_keys=True).encode(), digest_size=8).hex()
+    cache_control = "private, max-age=10"
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+    response = jsonify(payload)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+_CORS_BASE_HEADERS = {
+    "Access-Control-Allow-Methods": "GET,POST,OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Allow-Credentials": "true",
+    "Access-Control-Max-Age": "600",
+}
+
+
+def _allowed_origin() -> str:
+    origin = request.headers.get("Origin")
+    if origin:
+        return origin
+    return request.host_url.rstrip("/")
 
 
 @app.before_request
 def handle_cors_preflight() -> Any:
     if request.method == "OPTIONS":
-        response = app.make_default_options_response()
-        return response
+        headers = {"Access-Control-Allow-Origin": _allowed_origin()}
+        headers.update(_CORS_BASE_HEADERS)
+        return "", 204, headers
     return None
 
 
 @app.after_request
 def add_cors_headers(response: Any) -> Any:
-    origin = request.headers.get("Origin")
-    if origin:
-        response.headers["Access-Control-Allow-Origin"] = origin
-    else:
-        response.headers["Access-Control-Allow-Origin"] = request.host_url.rstrip("/")
+    if request.method == "OPTIONS":
+        return response
+    response.headers["Access-Control-Allow-Origin"] = _allowed_origin()
     response.headers["Access-Control-Allow-Credentials"] = "true"
     response.headers["Access-Control-Allow-Headers"] = "Content-Type"
     response.headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS"
@@ -291,8 +597,10 @@ def build_email_message(
     subject: str,
     body: str,
     sender: Optional[str] = None,
-) -> EmailMessage:
+) -> "EmailMessage":
     """Create an email message object with sane defaults."""
+    from email.message import EmailMessage
+
     sender_address = sender or DEFAULT_FROM_EMAIL
     if not sender_address:
         raise ValueError("Missing MAIL_FROM_ADDRESS environment variable.")
@@ -305,8 +613,10 @@ def build_email_message(
     return msg
 
 
-def send_email_via_smtp(msg: EmailMessage) -> None:
+def send_email_via_smtp(msg: "EmailMessage") -> None:
     """Send the email using SMTP credentials from environment variables."""
+    import smtplib
+
     smtp_host = os.getenv("MAIL_SMTP_HOST")
     smtp_port = int(os.getenv("MAIL_SMTP_PORT", "587"))
     smtp_user = os.getenv("MAIL_SMTP_USERNAME")
@@ -327,8 +637,10 @@ def send_email_via_smtp(msg: EmailMessage) -> None:
 
 
 @app.post("/api/send-email")
-def send_email() -> Any:
-    payload = request.get_json(force=True, silent=True) or {}
+async def send_email() -> Any:
+    import smtplib
+
+    payload = read_json_body()
     to_address = (payload.get("to") or "").strip()
     subject = (payload.get("subject") or "Hello from Lets Build Something").strip()
     message_body = (payload.get("message") or "").strip()
@@ -347,7 +659,7 @@ def send_email() -> Any:
             body=message_body,
             sender=sender_override,
         )
-        send_email_via_smtp(msg)
+        await asyncio.get_running_loop().run_in_executor(_EXEC, send_email_via_smtp, msg)
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
     except smtplib.SMTPException as exc:
@@ -356,69 +668,155 @@ def send_email() -> Any:
     return jsonify({"success": True, "message": "Email sent successfully."}), 200
 
 
-def call_openai_chat(prompt: str, api_key_override: Optional[str] = None) -> str:
-    """Send a chat completion request to OpenAI."""
+_OPENAI_SESSION: Optional["requests.Session"] = None
+_OPENAI_SESSION_LOCK = threading.Lock()
+
+
+def _openai_session() -> "requests.Session":
+    """Build the pooled HTTP session on first use so import stays lean."""
+    global _OPENAI_SESSION
+    if _OPENAI_SESSION is None:
+        with _OPENAI_SESSION_LOCK:
+            if _OPENAI_SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                http = requests.Session()
+                http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+                _OPENAI_SESSION = http
+    return _OPENAI_SESSION
+
+
+_SYSTEM_MSG = {
+    "role": "system",
+    "content": (
+        "You are MetroDocs AI, an assistant for Kochi Metro Rail Limited's "
+        "document portal. Provide concise, professional answers focused on "
+        "datasets, uploads, and process guidance. If unsure, ask for more details."
+    ),
+}
+
+OPENAI_MODEL = "gpt-3.5-turbo"
+OPENAI_TEMPERATURE = 0.3
+OPENAI_MAX_TOKENS = 300
+
+
+def load_openai_config() -> None:
+    """Re-read the OpenAI tuning knobs from the environment."""
+    global OPENAI_MODEL, OPENAI_TEMPERATURE, OPENAI_MAX_TOKENS
+    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+    OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.3"))
+    OPENAI_MAX_TOKENS = int(os.getenv("OPENAI_MAX_TOKENS", "300"))
+
+
+load_openai_config()
+
+
+def open_openai_stream(prompt: str, api_key_override: Optional[str] = None) -> "requests.Response":
+    """Start a streaming chat completion request against OpenAI."""
     api_key = api_key_override or os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OpenAI API key is not configured. Set OPENAI_API_KEY.")
 
-    model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
-    messages = [
-        {
-            "role": "system",
-            "content": (
-                "You are MetroDocs AI, an assistant for Kochi Metro Rail Limited's "
-                "document portal. Provide concise, professional answers focused on "
-                "datasets, uploads, and process guidance. If unsure, ask for more details."
-            ),
-        },
-        {"role": "user", "content": prompt},
-    ]
-
-    response = requests.post(
+    response = _openai_session().post(
         "https://api.openai.com/v1/chat/completions",
         headers={
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         },
         json={
-            "model": model,
-            "messages": messages,
-            "temperature": float(os.getenv("OPENAI_TEMPERATURE", "0.3")),
-            "max_tokens": int(os.getenv("OPENAI_MAX_TOKENS", "300")),
+            "model": OPENAI_MODEL,
+            "messages": [_SYSTEM_MSG, {"role": "user", "content": prompt}],
+            "temperature": OPENAI_TEMPERATURE,
+            "max_tokens": OPENAI_MAX_TOKENS,
+            "stream": True,
         },
+        stream=True,
         timeout=30,
     )
     response.raise_for_status()
-    data = response.json()
-    choices = data.get("choices")
-    if not choices:
-        raise ValueError("OpenAI response did not include any choices.")
-    message = choices[0].get("message", {})
-    content = (message.get("content") or "").strip()
-    if not content:
-        raise ValueError("OpenAI response was empty.")
-    return content
+    return response
+
+
+_CHAT_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=600)
+_CHAT_CACHE_LOCK = threading.Lock()
+
+
+def _chat_cache_key(message: str) -> bytes:
+    raw = f"{OPENAI_MODEL}|{OPENAI_TEMPERATURE}|{message}".encode()
+    return fast_digest(raw)
+
+
+def iter_openai_deltas(response: "requests.Response"):
+    """Yield content fragments from an OpenAI server-sent-event stream."""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        try:
+            chunk = json.loads(data)
+        except json.JSONDecodeError:
+            continue
+        choices = chunk.get("choices") or []
+        if not choices:
+            continue
+        delta = (choices[0].get("delta") or {}).get("content")
+        if delta:
+            yield delta
 
 
 @app.post("/api/chat")
-def chat() -> Any:
-    payload = request.get_json(force=True, silent=True) or {}
+async def chat() -> Any:
+    import requests
+
+    payload = read_json_body()
     user_message = (payload.get("message") or "").strip()
     if not user_message:
         return jsonify({"error": "Please include a message for the assistant."}), 400
 
+    provided_key = request.headers.get("X-OpenAI-Key")
+
+    # Caller-supplied keys bypass the cache so replies never leak across keys.
+    cache_key = None if provided_key else _chat_cache_key(user_message)
+    if cache_key is not None:
+        with _CHAT_CACHE_LOCK:
+            cached = _CHAT_CACHE.get(cache_key)
+        if cached is not None:
+            # Replay through the same SSE framing as a live stream so the
+            # client sees one response contract either way.
+            def replay():
+                yield f"data: {json.dumps(cached)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return Response(replay(), mimetype="text/event-stream")
+
     try:
-        provided_key = request.headers.get("X-OpenAI-Key")
-        reply = call_openai_chat(user_message, api_key_override=provided_key)
+        upstream = await asyncio.get_running_loop().run_in_executor(
+            _EXEC, open_openai_stream, user_message, provided_key
+        )
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
-    except RequestException as exc:
+    except requests.RequestException as exc:
         return jsonify({"error": f"Unable to reach OpenAI: {exc}"}), 502
     except Exception as exc:  # pragma: no cover - catch unexpected issues
         return jsonify({"error": f"Assistant error: {exc}"}), 500
 
-    return jsonify({"reply": reply})
+    def generate():
+        parts = []
+        try:
+            for delta in iter_openai_deltas(upstream):
+                parts.append(delta)
+                yield f"data: {json.dumps(delta)}\n\n"
+            yield "data: [DONE]\n\n"
+            if cache_key is not None and parts:
+                with _CHAT_CACHE_LOCK:
+                    _CHAT_CACHE[cache_key] = "".join(parts)
+        finally:
+            upstream.close()
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream")
 
 
 if __name__ == "__main__":